@@ -0,0 +1,117 @@
+# apps/api/bench_answers.py
+# LLM-call reduction vs answer quality for the /ask confidence gate.
+#
+#   python bench_answers.py bench_data/qa_sample.jsonl
+#   python bench_answers.py my_qa.jsonl --thresholds 0.5,0.65,0.8 --granularity auto
+#   python bench_answers.py my_qa.jsonl --llm      # also score real Groq answers (needs GROQ_API_KEY)
+#
+# Input: one document per line
+#   {"title": "...", "text": "...", "qa": [{"question": "...", "answer": "..."}]}
+#
+# For every threshold it reports how many /ask calls the gate answers
+# extractively (= Groq calls saved) and the answer quality:
+#   contains - gold answer appears in the returned answer (normalized)
+#   f1       - SQuAD-style token F1 against the gold answer
+# "gated" scores only the questions the gate answered; "blended" is what users
+# get overall (extractive when gated, otherwise LLM — or extractive without --llm).
+import argparse
+import json
+import os
+import re
+import string
+import sys
+from collections import Counter
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import main  # noqa: E402
+
+_CITE = re.compile(r"\s*\[#\d+\]")
+
+
+def _normalize(text: str) -> str:
+    text = _CITE.sub("", text or "").lower()
+    text = "".join(ch for ch in text if ch not in string.punctuation)
+    text = re.sub(r"\b(a|an|the)\b", " ", text)
+    return " ".join(text.split())
+
+
+def contains(pred: str, gold: str) -> float:
+    return float(_normalize(gold) in _normalize(pred))
+
+
+def f1(pred: str, gold: str) -> float:
+    p, g = _normalize(pred).split(), _normalize(gold).split()
+    common = sum((Counter(p) & Counter(g)).values())
+    if not p or not g or not common:
+        return 0.0
+    precision, recall = common / len(p), common / len(g)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _mean(xs: List[float]) -> float:
+    return sum(xs) / len(xs) if xs else 0.0
+
+
+def run(path: str, thresholds: List[float], granularity: str, k: int, use_llm: bool) -> List[Dict]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    for item in items:
+        res = main._create_doc_from_text(url=item.get("url", "bench://local"), title=item.get("title"), text=item["text"])
+        doc = main.get_document(res.doc_id)
+        for qa in item["qa"]:
+            req = main.AskByIdRequest(doc_id=doc.id, question=qa["question"], k=k, mode="extractive", granularity=granularity)
+            ex = main._answer(doc, req)
+            llm_answer = None
+            if use_llm:
+                req = main.AskByIdRequest(doc_id=doc.id, question=qa["question"], k=k, mode="llm",
+                                          granularity=granularity, min_confidence=2.0)  # force the LLM path
+                out = main._answer(doc, req)
+                llm_answer = out.answer if out.path == "llm" else None
+            rows.append({"question": qa["question"], "gold": qa["answer"], "confidence": ex.confidence,
+                         "extractive": ex.answer, "llm": llm_answer})
+
+    report = []
+    for t in thresholds:
+        gated = [r for r in rows if r["extractive"] and r["confidence"] >= t]
+        gated_ids = {id(r) for r in gated}
+        blended = [r["extractive"] if id(r) in gated_ids or r["llm"] is None else r["llm"] for r in rows]
+        report.append({
+            "threshold": t,
+            "questions": len(rows),
+            "llm_calls_saved": len(gated),
+            "llm_call_reduction": round(len(gated) / len(rows), 3) if rows else 0.0,
+            "gated_contains": round(_mean([contains(r["extractive"], r["gold"]) for r in gated]), 3),
+            "gated_f1": round(_mean([f1(r["extractive"], r["gold"]) for r in gated]), 3),
+            "blended_contains": round(_mean([contains(a, r["gold"]) for a, r in zip(blended, rows)]), 3),
+            "blended_f1": round(_mean([f1(a, r["gold"]) for a, r in zip(blended, rows)]), 3),
+        })
+    return report
+
+
+def main_cli():
+    ap = argparse.ArgumentParser(description="LLM-call reduction vs answer quality for the /ask confidence gate")
+    ap.add_argument("dataset")
+    ap.add_argument("--thresholds", default="0.4,0.5,0.65,0.8,0.9")
+    ap.add_argument("--granularity", default="chunk", choices=["chunk", "sentence", "auto", "section"])
+    ap.add_argument("-k", type=int, default=3)
+    ap.add_argument("--llm", action="store_true", help="also call Groq for non-gated questions")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    thresholds = [float(t) for t in args.thresholds.split(",") if t.strip()]
+    report = run(args.dataset, thresholds, args.granularity, args.k, args.llm)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    cols = ["threshold", "llm_call_reduction", "gated_contains", "gated_f1", "blended_contains", "blended_f1"]
+    print("  ".join(f"{c:>16}" for c in cols))
+    for r in report:
+        print("  ".join(f"{r[c]:>16}" for c in cols))
+
+
+if __name__ == "__main__":
+    main_cli()
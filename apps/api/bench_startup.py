@@ -0,0 +1,108 @@
+# apps/api/bench_startup.py
+# Cold-start benchmark with a regression budget.
+#
+#   python bench_startup.py                      # default budgets
+#   python bench_startup.py --runs 5 --import-budget 1.0 --health-budget 3.0
+#   python bench_startup.py --with-snapshot      # keep SNAPSHOT_DIR, time the warm start too
+#
+# Measures (median over --runs fresh processes):
+#   import  - `import main` in a new interpreter
+#   health  - spawn uvicorn → first 200 from GET /health
+# and checks that importing main does not pull in the heavy engines.
+# Exits 1 if any budget is exceeded, so it can gate CI / deploys.
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY = ("sklearn", "scipy", "numpy", "trafilatura", "langdetect", "groq", "lxml")
+
+_IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "t = time.perf_counter()\n"
+    "import main\n"
+    "dt = time.perf_counter() - t\n"
+    f"print(json.dumps({{'seconds': dt, 'heavy': [m for m in {HEAVY!r} if m in sys.modules]}}))\n"
+)
+
+
+def _env(with_snapshot: bool = False):
+    env = dict(os.environ)
+    if not with_snapshot:
+        env["SNAPSHOT_DIR"] = ""  # measure a plain cold start, even if the deploy env sets one
+    return env
+
+
+def measure_import(with_snapshot: bool = False):
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE], cwd=HERE, env=_env(with_snapshot),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_health(with_snapshot: bool = False, timeout_s: float = 30.0) -> float:
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=HERE, env=_env(with_snapshot), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout_s:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - t0
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"/health not ready after {timeout_s}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold-start benchmark")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--import-budget", type=float, default=1.0, help="seconds, median `import main`")
+    ap.add_argument("--health-budget", type=float, default=3.0, help="seconds, median time to first /health")
+    ap.add_argument("--with-snapshot", action="store_true", help="keep SNAPSHOT_DIR so startup loads the snapshot")
+    args = ap.parse_args()
+
+    imports = [measure_import(args.with_snapshot) for _ in range(args.runs)]
+    healths = [measure_health(args.with_snapshot) for _ in range(args.runs)]
+    import_s = statistics.median(r["seconds"] for r in imports)
+    health_s = statistics.median(healths)
+    heavy = sorted({m for r in imports for m in r["heavy"]})
+
+    print(f"import main      : {import_s:.3f}s (budget {args.import_budget:.3f}s)")
+    print(f"first /health    : {health_s:.3f}s (budget {args.health_budget:.3f}s)")
+    print(f"heavy on import  : {', '.join(heavy) or 'none'}")
+
+    failed = []
+    if import_s > args.import_budget:
+        failed.append("import time over budget")
+    if health_s > args.health_budget:
+        failed.append("time to first /health over budget")
+    if heavy:
+        failed.append("heavy modules imported eagerly: " + ", ".join(heavy))
+    for f in failed:
+        print("FAIL:", f)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import re
-from typing import List, Tuple
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
 from doc_store import Chunk
 from uuid import uuid4
 
@@ -45,37 +46,90 @@ def split_into_sentences(text: str) -> List[str]:
     # crude but good enough for MVP
     return [s.strip() for s in _SENT_SPLIT.split(text) if s.strip()]
 
-def build_chunks(text: str, target_size: int = 1200, overlap_sentences: int = 1) -> List[Chunk]:
+PAGE_SEP = "\n\n"
+
+def join_pages(pages: Iterable[Tuple[Optional[int], str]]) -> Tuple[str, List[Tuple[int, int, int]]]:
+    """
+    Consume a (page_number, text) stream one piece at a time.
+    Numbered pages are trimmed and separated by a blank line; unnumbered pieces
+    (TXT blocks, DOCX paragraphs) are appended as-is.
+    Returns the joined text plus (start, end, page) spans for every numbered page,
+    ready to hand to build_chunks(..., page_spans=...).
+    """
+    parts: List[str] = []
+    spans: List[Tuple[int, int, int]] = []
+    cursor = 0
+    for page_no, page_text in pages:
+        if page_no is None:
+            parts.append(page_text or "")
+            cursor += len(page_text or "")
+            continue
+        page_text = (page_text or "").strip()
+        if not page_text:
+            continue
+        if parts:
+            parts.append(PAGE_SEP)
+            cursor += len(PAGE_SEP)
+        parts.append(page_text)
+        spans.append((cursor, cursor + len(page_text), page_no))
+        cursor += len(page_text)
+    return "".join(parts), spans
+
+def _page_at(offset: int, span_starts: List[int], page_spans: List[Tuple[int, int, int]]) -> Optional[int]:
+    i = bisect_right(span_starts, offset) - 1
+    return page_spans[i][2] if i >= 0 else None
+
+def build_chunks(
+    text: str,
+    target_size: int = 1200,
+    overlap_sentences: int = 1,
+    page_spans: Optional[List[Tuple[int, int, int]]] = None,
+    sent_spans: Optional[List[Tuple[int, int]]] = None,
+) -> List[Chunk]:
     """
     Pack full sentences into ~target_size-char chunks.
     Chunks start and end on sentence boundaries.
     Overlap is by N sentences (default 1), not by raw characters.
+    If page_spans (from join_pages) is given, each chunk is tagged with its page range.
+    sent_spans (from sentence_spans) can be passed in when the caller also needs them.
     """
-    sents = split_into_sentences(text)
-    if not sents:
-        return [Chunk(id=str(uuid4()), start=0, end=len(text), text=text)]
+    if sent_spans is None:
+        sent_spans = sentence_spans(text)
+    chunks = _pack_sentences(text, sent_spans, target_size, overlap_sentences)
+    if page_spans:
+        span_starts = [s for s, _, _ in page_spans]
+        for c in chunks:
+            c.page = _page_at(c.start, span_starts, page_spans)
+            c.page_end = _page_at(max(c.start, c.end - 1), span_starts, page_spans)
+    return chunks
 
-    # Map each sentence to its (start,end) offsets in the original text
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) offsets of every sentence in text, in order."""
     indices: List[Tuple[int, int]] = []
     cursor = 0
-    for s in sents:
+    for s in split_into_sentences(text):
         i = text.find(s, cursor)
         if i == -1:
             i = text.find(s)  # fallback if duplicates exist
         start, end = i, i + len(s)
         indices.append((start, end))
         cursor = end
+    return indices
+
+def _pack_sentences(text: str, indices: List[Tuple[int, int]], target_size: int, overlap_sentences: int) -> List[Chunk]:
+    if not indices:
+        return [Chunk(id=str(uuid4()), start=0, end=len(text), text=text)]
 
     chunks: List[Chunk] = []
     i = 0
-    while i < len(sents):
+    while i < len(indices):
         start_idx = max(0, i - overlap_sentences) if chunks else i  # add sentence overlap after the first chunk
         start_off = indices[start_idx][0]
 
         # include sentences until we approach target_size
         j = i
         end_off = indices[j][1]
-        while j + 1 < len(sents):
+        while j + 1 < len(indices):
             next_end = indices[j + 1][1]
             if next_end - start_off > target_size:
                 break
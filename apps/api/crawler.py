@@ -0,0 +1,318 @@
+# apps/api/crawler.py
+# Background crawl jobs: start from a seed URL, follow links breadth-first
+# (priority = depth) within depth/page/domain limits, and ingest every page
+# through the same extraction + doc creation path as /ingest.
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+
+from ingest_utils import DEFAULT_HEADERS, extract_main, normalize_url
+from jobs import MAX_JOBS_KEPT
+
+if TYPE_CHECKING:
+    import httpx
+
+MAX_DEPTH_CAP = 5
+MAX_PAGES_CAP = 500
+WORKERS_PER_JOB = int(os.getenv("CRAWL_WORKERS_PER_JOB", "4"))
+MAX_CONNECTIONS = int(os.getenv("CRAWL_MAX_CONNECTIONS", "8"))     # shared by all jobs
+HOST_DELAY_S = float(os.getenv("CRAWL_HOST_DELAY_S", "0.5"))       # politeness per host
+MAX_HOST_DELAY_S = 10.0                                           # cap on robots Crawl-delay
+ROBOTS_TTL_S = 3600
+FETCH_TIMEOUT_S = 15
+MAX_ERRORS_KEPT = 50
+
+# links to things we can't extract text from anyway
+_SKIP_EXT = (
+    ".pdf", ".zip", ".gz", ".tar", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp",
+    ".ico", ".css", ".js", ".json", ".xml", ".mp3", ".mp4", ".avi", ".mov", ".woff", ".woff2",
+)
+
+
+class SeenSet:
+    """URL-seen set that stores 8-byte digests of normalized URLs instead of the strings."""
+    def __init__(self):
+        self._digests: Set[bytes] = set()
+
+    def add(self, url: str) -> bool:
+        """Returns True if the URL was not seen before."""
+        d = hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=8).digest()
+        if d in self._digests:
+            return False
+        self._digests.add(d)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+class FetchPool:
+    """
+    One shared httpx client for all crawl jobs: caps concurrent connections
+    and spaces out requests to the same host.
+    """
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, host_delay_s: float = HOST_DELAY_S):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sem = asyncio.Semaphore(max_connections)
+        self._host_delay_s = host_delay_s
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._host_next: Dict[str, float] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS, follow_redirects=True, timeout=FETCH_TIMEOUT_S
+            )
+        return self._client
+
+    async def _wait_turn(self, host: str, delay_s: float):
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait = self._host_next.get(host, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_next[host] = time.monotonic() + max(delay_s, self._host_delay_s)
+
+    async def get(self, url: str, delay_s: float = 0.0) -> httpx.Response:
+        await self._wait_turn(urlsplit(url).netloc.lower(), delay_s)
+        async with self._sem:
+            return await self._get_client().get(url)
+
+    async def fetch_html(self, url: str, delay_s: float = 0.0) -> Tuple[str, str]:
+        """Returns (final_url, html). Raises on HTTP errors and non-HTML responses."""
+        resp = await self.get(url, delay_s)
+        resp.raise_for_status()
+        ctype = resp.headers.get("content-type", "")
+        if ctype and "html" not in ctype.lower():
+            raise ValueError(f"not HTML ({ctype.split(';')[0]})")
+        return str(resp.url), resp.text
+
+
+class RobotsCache:
+    """robots.txt parsed once per host and reused for ROBOTS_TTL_S."""
+    def __init__(self, pool: FetchPool, ttl_s: int = ROBOTS_TTL_S):
+        self._pool = pool
+        self._ttl_s = ttl_s
+        self._cache: Dict[str, Tuple[float, RobotFileParser]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _parser(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc.lower()}"
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:  # one robots.txt fetch per host, even with many workers
+            hit = self._cache.get(origin)
+            if hit and time.monotonic() - hit[0] < self._ttl_s:
+                return hit[1]
+            rp = RobotFileParser(origin + "/robots.txt")
+            try:
+                resp = await self._pool.get(origin + "/robots.txt")
+                if resp.status_code in (401, 403):
+                    rp.disallow_all = True
+                elif resp.status_code >= 400:
+                    rp.allow_all = True
+                else:
+                    rp.parse(resp.text.splitlines())
+            except Exception:
+                rp.allow_all = True  # unreachable robots.txt → don't block the crawl
+            self._cache[origin] = (time.monotonic(), rp)
+            return rp
+
+    async def check(self, url: str) -> Tuple[bool, float]:
+        """Returns (allowed, crawl_delay_s) for our user agent."""
+        rp = await self._parser(url)
+        agent = DEFAULT_HEADERS["User-Agent"]
+        delay = rp.crawl_delay(agent) or 0.0
+        return rp.can_fetch(agent, url), min(float(delay), MAX_HOST_DELAY_S)
+
+
+_POOL: Optional[FetchPool] = None
+_ROBOTS: Optional[RobotsCache] = None
+
+def _shared() -> Tuple[FetchPool, RobotsCache]:
+    global _POOL, _ROBOTS
+    if _POOL is None:
+        _POOL = FetchPool()
+        _ROBOTS = RobotsCache(_POOL)
+    return _POOL, _ROBOTS
+
+
+def extract_links(base_url: str, html: str) -> List[str]:
+    from lxml import html as lxml_html  # lxml ships with trafilatura
+    try:
+        tree = lxml_html.fromstring(html)
+        tree.make_links_absolute(base_url, resolve_base_href=True)
+    except Exception:
+        return []
+    out = []
+    for el, attr, link, _ in tree.iterlinks():
+        if el.tag != "a" or attr != "href":
+            continue
+        parts = urlsplit(link)
+        if parts.scheme not in ("http", "https"):
+            continue
+        try:
+            parts.port
+        except ValueError:
+            continue  # malformed port, e.g. "example.com:8o"
+        if parts.path.lower().endswith(_SKIP_EXT):
+            continue
+        out.append(parts._replace(fragment="").geturl())
+    return out
+
+
+def _parse_page(url: str, html: str) -> Tuple[List[str], dict]:
+    return extract_links(url, html), extract_main(url, html)
+
+
+@dataclass
+class CrawlJob:
+    id: str
+    seed: str
+    max_depth: int
+    max_pages: int
+    same_domain: bool
+    status: str = "queued"          # queued | running | done | cancelled | failed
+    queued: int = 0                 # URLs admitted to the frontier
+    fetched: int = 0
+    ingested: int = 0
+    failed: int = 0
+    skipped_robots: int = 0
+    doc_ids: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def record_error(self, url: str, e: Exception):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append(f"{url}: {e}")
+
+
+_JOBS: Dict[str, CrawlJob] = {}
+
+def get_job(job_id: str) -> Optional[CrawlJob]:
+    return _JOBS.get(job_id)
+
+def start_crawl(seed: str, create_doc: Callable, max_depth: int = 2, max_pages: int = 50,
+                same_domain: bool = True) -> CrawlJob:
+    """
+    create_doc(url=, title=, text=) is main._create_doc_from_text; it runs in the
+    threadpool and must return an object with a doc_id.
+    """
+    job = CrawlJob(
+        id=str(uuid4()), seed=seed, same_domain=same_domain,
+        max_depth=max(0, min(max_depth, MAX_DEPTH_CAP)),
+        max_pages=max(1, min(max_pages, MAX_PAGES_CAP)),
+    )
+    _JOBS[job.id] = job
+    _trim_jobs()
+    job.task = asyncio.create_task(_run(job, create_doc))
+    return job
+
+def _trim_jobs():
+    # drop the oldest finished jobs once we remember too many
+    extra = len(_JOBS) - MAX_JOBS_KEPT
+    if extra <= 0:
+        return
+    for job_id in [j.id for j in _JOBS.values() if j.finished_at is not None][:extra]:
+        del _JOBS[job_id]
+
+def cancel_job(job: CrawlJob) -> bool:
+    """Must be called on the event loop that runs the job (i.e. from async code)."""
+    if job.task and not job.task.done():
+        job.task.cancel()
+        return True
+    return False
+
+
+async def _run(job: CrawlJob, create_doc: Callable):
+    pool, robots = _shared()
+    seen = SeenSet()
+    frontier: asyncio.PriorityQueue = asyncio.PriorityQueue()
+    seed_host = urlsplit(job.seed).netloc.lower()
+    seq = 0
+
+    def admit(url: str, depth: int):
+        nonlocal seq
+        if depth > job.max_depth or job.queued >= job.max_pages:
+            return
+        if job.same_domain and urlsplit(url).netloc.lower() != seed_host:
+            return
+        try:
+            if not seen.add(url):
+                return
+        except ValueError:
+            return  # unparseable URL: skip the link, not the page it came from
+        seq += 1
+        job.queued += 1
+        frontier.put_nowait((depth, seq, url))
+
+    async def visit(depth: int, url: str):
+        allowed, delay = await robots.check(url)
+        if not allowed:
+            job.skipped_robots += 1
+            return
+        final_url, html = await pool.fetch_html(url, delay)
+        job.fetched += 1
+        if final_url != url:
+            seen.add(final_url)  # redirect target counts as visited too
+            # the client follows redirects, so re-apply the domain and robots rules to where we landed
+            if job.same_domain and urlsplit(final_url).netloc.lower() != seed_host:
+                return
+            allowed, _ = await robots.check(final_url)
+            if not allowed:
+                job.skipped_robots += 1
+                return
+
+        # lxml link parsing and trafilatura extraction are both CPU-bound → one threadpool hop
+        links, extracted = await run_in_threadpool(_parse_page, final_url, html)
+        for link in links:
+            admit(link, depth + 1)
+
+        text = (extracted.get("text") or "").strip()
+        if not text:
+            raise ValueError("could not extract main content")
+        title = extracted.get("title") or final_url.split("/")[-1]
+        res = await run_in_threadpool(create_doc, url=final_url, title=title, text=text)
+        job.doc_ids.append(res.doc_id)
+        job.ingested += 1
+
+    async def worker():
+        while True:
+            depth, _, url = await frontier.get()
+            try:
+                await visit(depth, url)
+            except Exception as e:
+                job.record_error(url, e)
+            finally:
+                frontier.task_done()
+
+    job.status = "running"
+    admit(job.seed, 0)
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, WORKERS_PER_JOB))]
+    try:
+        await frontier.join()
+        job.status = "done"
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+    except Exception as e:
+        job.status = "failed"
+        job.errors.append(repr(e))
+    finally:
+        for w in workers:
+            w.cancel()
+        job.finished_at = datetime.utcnow()
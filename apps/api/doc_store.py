@@ -10,6 +10,8 @@ class Chunk:
     start: int
     end: int
     text: str
+    page: Optional[int] = None       # 1-based page where the chunk starts (paged files only)
+    page_end: Optional[int] = None   # 1-based page where the chunk ends
 
 @dataclass
 class Document:
@@ -35,5 +37,12 @@ def save_document(url: str, title: Optional[str], lang: Optional[str], text: str
 def get_document(doc_id: str) -> Optional[Document]:
     return _DB.get(doc_id)
 
+def put_document(doc: Document) -> None:
+    """Insert an already-built Document as-is (keeps its id), e.g. from a snapshot."""
+    _DB[doc.id] = doc
+
+def all_documents() -> List[Document]:
+    return list(_DB.values())
+
 def count() -> int:
     return len(_DB)
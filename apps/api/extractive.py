@@ -0,0 +1,177 @@
+# apps/api/extractive.py
+# Query-focused extractive answering for /ask: score the sentences of the
+# retrieved passages against the question and estimate how confident we are
+# that the best one(s) already answer it. Above a threshold the LLM call is
+# skipped entirely.
+import os
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from math import log
+from typing import Dict, List, Optional, Set, Tuple
+
+from hier_index import get_hier_index, is_heading
+
+# Off by default (confidence never exceeds 1): opt in once bench_answers.py on your own
+# questions shows an acceptable quality/LLM-call trade-off, e.g. 0.65.
+CONFIDENCE_THRESHOLD = float(os.getenv("EXTRACTIVE_CONFIDENCE_THRESHOLD", "1.1"))
+MAX_ANSWER_SENTENCES = 2
+SECOND_SENTENCE_RATIO = 0.75    # a 2nd sentence must score at least this share of the best
+MAX_SENTENCE_CHARS = 400        # longer "sentences" are usually unsplit blobs, poor answers
+MIN_NEW_TERMS = 2               # fewer terms beyond the question's own → the sentence just restates it
+RESTATES_PENALTY = 0.5
+TYPE_MISS_PENALTY = 0.5         # question wants a number/time/person the sentence doesn't have
+TYPE_BONUS = 0.1
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOP = frozenset("""
+a an the and or but if of to in on at by for with from as is are was were be been being do does did
+what which who whom whose when where why how that this these those it its it's i you he she we they
+me my your his her our their there here can could should would will shall may might must about into
+than then so such not no yes any all some more most other also just only very please tell explain
+""".split())
+# questions that want reasoning or synthesis rather than a fact lookup
+_OPEN_ENDED = re.compile(r"^\s*(why|how (?!many|much|long|old|far|big)|explain|describe|compare|summari[sz]e|discuss)", re.I)
+_NUMBER = re.compile(r"\d|\b(one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|dozen|hundred|thousand|million|billion)\b", re.I)
+_MONTH = re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b", re.I)
+# "Anna Schmidt", "by Schmidt" — but not places like "in New York"
+_PERSON = re.compile(r"(?<!\bin )(?<!\bat )(?<!\bfrom )(?<!\bnear )\b[A-Z][a-z]+ [A-Z][a-z'-]+|\bby [A-Z][a-z]+")
+_WANTS_NUMBER = re.compile(r"^\s*how (many|much|long|old|far|big)|\b(what|which) (year|percentage|number|price|cost)|\b(price|cost)\b", re.I)
+_WANTS_TIME = re.compile(r"^\s*when\b|\bwhat (year|date|time)\b", re.I)
+_WANTS_PERSON = re.compile(r"^\s*who\b|\bwhom\b", re.I)
+
+
+@dataclass
+class ExtractiveAnswer:
+    text: str
+    confidence: float
+    cites: List[int] = field(default_factory=list)   # 1-based chunk numbers used
+
+
+def _stem(t: str) -> str:
+    """Crude suffix folding: "widgets" ~ "widget", "founded" ~ "founder", "prices" ~ "price"."""
+    if len(t) > 3 and t.endswith("s") and not t.endswith("ss"):
+        t = t[:-1]
+    for suffix in ("ing", "ed", "er"):
+        if t.endswith(suffix) and len(t) - len(suffix) >= 3:
+            return t[:-len(suffix)]
+    return t[:-1] if len(t) > 4 and t.endswith("e") else t
+
+
+def _terms(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN.findall(text.lower())
+            if t not in _STOP and (len(t) >= 2 or t.isdigit())]
+
+
+def _answer_type(question: str) -> Optional[str]:
+    if _WANTS_TIME.search(question):
+        return "time"
+    if _WANTS_NUMBER.search(question):
+        return "number"
+    if _WANTS_PERSON.search(question):
+        return "person"
+    return None
+
+
+def _has_type(sent: str, kind: str, question: str) -> bool:
+    if kind == "number":
+        return bool(_NUMBER.search(sent))
+    if kind == "time":
+        return bool(_NUMBER.search(sent) or _MONTH.search(sent))
+    # person: a full name (or "by Name") that isn't already in the question
+    q = question.lower()
+    return any(m.lower() not in q for m in _PERSON.findall(sent))
+
+
+def _strip_headings(sent: str) -> str:
+    """The sentence splitter glues a heading line onto the sentence after it; drop it."""
+    lines = sent.split("\n")
+    while len(lines) > 1 and is_heading(lines[0].strip()):
+        lines.pop(0)
+    return " ".join(l.strip() for l in lines)
+
+
+def candidates_from_spans(doc, units: List[Tuple[int, int, int]]) -> List[Tuple[int, str]]:
+    """
+    Sentences inside the retrieved units, as (chunk_index, sentence) pairs.
+    units: (chunk_index, start, end) offsets into doc.text.
+    """
+    idx = get_hier_index(doc)
+    starts, ends = idx.sent_start.tolist(), idx.sent_end.tolist()
+    out, seen = [], set()
+    for chunk, s, e in units:
+        i = bisect_left(starts, s)
+        while i < len(starts) and ends[i] <= e:
+            if i not in seen:  # overlapping chunks share a sentence
+                seen.add(i)
+                out.append((chunk, _strip_headings(doc.text[starts[i]:ends[i]].strip())))
+            i += 1
+    return out
+
+
+def score_sentences(question: str, candidates: List[Tuple[int, str]]) -> List[Tuple[float, int, int, str]]:
+    """
+    (score, position in candidates, chunk_index, sentence), best first.
+    Score in [0, 1]: idf-weighted share of the question's terms the sentence
+    covers, then adjusted for whether it can be an answer at all: penalised
+    when it adds almost nothing beyond the question's own terms, and when the
+    question wants a number, time or person the sentence doesn't contain (a
+    small bonus when it does).
+    """
+    q_terms = set(_terms(question))
+    if not q_terms or not candidates:
+        return []
+    sent_terms: List[Set[str]] = [set(_terms(s)) for _, s in candidates]
+
+    # idf over the candidate pool, smoothed so unseen question terms still count
+    n = len(candidates)
+    df: Dict[str, int] = {t: sum(1 for st in sent_terms if t in st) for t in q_terms}
+    idf = {t: log((n + 1) / (df[t] + 1)) + 1.0 for t in q_terms}
+    total = sum(idf.values())
+    kind = _answer_type(question)
+
+    scored = []
+    for pos, ((chunk, sent), terms) in enumerate(zip(candidates, sent_terms)):
+        if len(sent) > MAX_SENTENCE_CHARS:
+            continue
+        coverage = sum(idf[t] for t in q_terms & terms) / total
+        if len(terms - q_terms) < MIN_NEW_TERMS:
+            coverage *= RESTATES_PENALTY
+        if kind and _has_type(sent, kind, question):
+            coverage = min(1.0, coverage + TYPE_BONUS)
+        elif kind:
+            coverage *= TYPE_MISS_PENALTY
+        scored.append((round(coverage, 6), pos, chunk, sent))
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return scored
+
+
+def answer(question: str, candidates: List[Tuple[int, str]]) -> ExtractiveAnswer:
+    """
+    Best 1–2 sentences with [#i] chunk citations, plus a confidence in [0, 1]:
+    the best sentence's coverage, reduced when a runner-up from another chunk
+    scores more than half as well (ambiguous) and halved for open-ended questions.
+    """
+    scored = score_sentences(question, candidates)
+    if not scored or scored[0][0] <= 0.0:
+        return ExtractiveAnswer(text="", confidence=0.0)
+
+    best, _, best_chunk, best_sent = scored[0]
+    picked = [scored[0]]
+    for s in scored[1:MAX_ANSWER_SENTENCES]:
+        if s[0] >= SECOND_SENTENCE_RATIO * best and s[3] != best_sent:
+            picked.append(s)
+
+    confidence = best
+    rival = next((s for s in scored[1:] if s[2] != best_chunk and s[3] != best_sent), None)
+    if rival and rival[0] > 0.5 * best:
+        confidence *= 1.5 - rival[0] / best   # an equally good rival elsewhere halves it
+    if _OPEN_ENDED.search(question):
+        confidence *= 0.5
+
+    picked.sort(key=lambda s: s[1])  # back to reading order
+    return ExtractiveAnswer(
+        text=" ".join(f"{sent} [#{chunk + 1}]" for _, _, chunk, sent in picked),
+        confidence=round(confidence, 3),
+        cites=sorted({chunk + 1 for _, _, chunk, _ in picked}),
+    )
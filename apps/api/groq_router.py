@@ -17,9 +17,10 @@ def _max_tokens() -> int:
     except Exception:
         return 7000
 
-def call_with_fallback(passages: List[str], question: str, api_key: str):
+def call_with_fallback(passages: List[str], question: str, api_key: str, labels: Optional[List[int]] = None):
     """
     Tries models in priority order. Retries transient failures with backoff.
+    labels: optional chunk numbers used for the [#i] headers of each passage.
     On context-length errors or persistent failure, falls through to next model.
     Returns (answer_text, model_used) or (None, None) if all failed.
     """
@@ -34,7 +35,7 @@ def call_with_fallback(passages: List[str], question: str, api_key: str):
         for attempt in range(1, MAX_RETRIES_PER_MODEL + 1):
             try:
                 print("Trying model:", model)
-                ans = answer_with_groq(passages, question, model, api_key, max_tokens=max_out)
+                ans = answer_with_groq(passages, question, model, api_key, max_tokens=max_out, labels=labels)
                 record_success(model)
                 return ans, model
             except Exception as e:
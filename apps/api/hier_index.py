@@ -0,0 +1,261 @@
+# apps/api/hier_index.py
+# Hierarchical (sentence → chunk → section) index over one document.
+# Scoring happens at sentence level; a hit is only widened to its parent chunk
+# or heading section when the caller asks for it (or, in "auto", when the
+# sentence alone is a weak match). Every level is a pair of offset arrays into
+# doc.text, built in one pass at ingest from the same sentence spans the
+# chunker uses. The sentence TF-IDF is fitted separately, only when a
+# sentence-level search or summary actually needs it.
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from chunking import sentence_spans
+from doc_store import Chunk
+from retrieval import _make_vectorizer
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+AUTO_SENTENCE_MIN = float(os.getenv("HIER_AUTO_SENTENCE_MIN", "0.25"))  # below this, "auto" widens to the chunk
+SENTENCE_CONTEXT = 1        # neighbours kept on each side of an "auto" sentence hit
+SECTION_MAX_CHARS = 2400    # section passages are trimmed to this, centred on the hit
+PASSAGE_JOIN = " … "
+
+_LINE = re.compile(r"[^\n]+")
+_HEADING = re.compile(r"^[A-Z0-9][^.!?:;,]{1,79}$")  # short line, no sentence punctuation
+
+
+@dataclass
+class HierIndex:
+    sent_start: "np.ndarray"        # int64 [n_sents] offsets into doc.text
+    sent_end: "np.ndarray"
+    sent_chunk: "np.ndarray"        # int32 [n_sents] owning chunk (0-based)
+    sent_section: "np.ndarray"      # int32 [n_sents] owning section
+    section_start: "np.ndarray"     # int64 [n_sections]
+    section_end: "np.ndarray"
+    section_title: List[Optional[str]]
+    vectorizer: Optional["TfidfVectorizer"] = None
+    X: object = None                # sparse [n_sents, vocab], None if nothing to index
+    fitted: bool = False            # vectorizer/X computed (they may still be None)
+    vectors_loader: Optional[Callable[[], Tuple[Optional["TfidfVectorizer"], object]]] = None  # snapshot
+
+
+@dataclass
+class Passage:
+    chunk_index: int    # 0-based chunk the passage is cited as
+    score: float
+    start: int
+    end: int
+    text: str
+    focus: str          # just the matching sentence(s), for extractive answers
+
+
+def is_heading(line: str) -> bool:
+    """Short, capitalised, no sentence punctuation."""
+    return bool(_HEADING.match(line)) and len(line.split()) <= 12
+
+
+def _headings(text: str) -> List[Tuple[int, str]]:
+    """Heading-like lines that are followed by a longer line."""
+    lines = [(m.start(), m.group().strip()) for m in _LINE.finditer(text)]
+    out = []
+    for (off, line), (_, nxt) in zip(lines, lines[1:]):
+        if is_heading(line) and len(nxt) > len(line):
+            out.append((off, line))
+    return out
+
+
+def _sections(text: str, chunks: List[Chunk]) -> Tuple[List[int], List[int], List[Optional[str]]]:
+    heads = _headings(text)
+    if heads:
+        starts = [off for off, _ in heads]
+        titles: List[Optional[str]] = [t for _, t in heads]
+        if starts[0] > 0:
+            starts.insert(0, 0)
+            titles.insert(0, None)
+        return starts, starts[1:] + [len(text)], titles
+    if any(c.page is not None for c in chunks):
+        # no headings but paged (PDF): one section per starting page
+        starts, titles, last_page = [], [], object()
+        for c in chunks:
+            if c.page != last_page:
+                starts.append(c.start)
+                titles.append(f"Page {c.page}" if c.page is not None else None)
+                last_page = c.page
+        starts[0] = 0
+        return starts, starts[1:] + [len(text)], titles
+    return [0], [len(text)], [None]
+
+
+def build_hier_index(text: str, chunks: List[Chunk],
+                     sent_spans: Optional[List[Tuple[int, int]]] = None, fit: bool = True) -> HierIndex:
+    import numpy as np
+
+    spans = sent_spans if sent_spans is not None else sentence_spans(text)
+    if not spans:
+        spans = [(0, len(text))]
+    sent_start = np.fromiter((s for s, _ in spans), dtype=np.int64, count=len(spans))
+    sent_end = np.fromiter((e for _, e in spans), dtype=np.int64, count=len(spans))
+
+    chunk_starts = np.fromiter((c.start for c in chunks), dtype=np.int64, count=len(chunks))
+    sent_chunk = np.clip(np.searchsorted(chunk_starts, sent_start, side="right") - 1, 0, None).astype(np.int32)
+
+    sec_start, sec_end, sec_title = _sections(text, chunks)
+    section_start = np.asarray(sec_start, dtype=np.int64)
+    sent_section = np.clip(np.searchsorted(section_start, sent_start, side="right") - 1, 0, None).astype(np.int32)
+
+    idx = HierIndex(
+        sent_start=sent_start, sent_end=sent_end, sent_chunk=sent_chunk, sent_section=sent_section,
+        section_start=section_start, section_end=np.asarray(sec_end, dtype=np.int64),
+        section_title=sec_title,
+    )
+    if fit:
+        _fit_sentences(text, idx)
+    return idx
+
+
+def sentence_vectors(text: str, idx: HierIndex) -> Tuple[Optional["TfidfVectorizer"], object]:
+    """(vectorizer, X) for idx's sentences: restored, already fitted, or fitted now (not cached)."""
+    if idx.fitted:
+        return idx.vectorizer, idx.X
+    if idx.vectors_loader is not None:
+        return idx.vectors_loader()
+    sents = [text[s:e] for s, e in zip(idx.sent_start.tolist(), idx.sent_end.tolist())]
+    try:
+        V = _make_vectorizer(len(sents))
+        return V, V.fit_transform(sents)
+    except ValueError:
+        return None, None  # e.g. only stop words: callers fall back to chunk retrieval
+
+
+def _fit_sentences(text: str, idx: HierIndex):
+    idx.vectorizer, idx.X = sentence_vectors(text, idx)
+    idx.fitted, idx.vectors_loader = True, None
+
+
+_HIER: Dict[str, HierIndex] = {}
+_PENDING: Dict[str, Callable[[], HierIndex]] = {}
+
+def put_hier_index(doc_id: str, index: HierIndex):
+    _PENDING.pop(doc_id, None)
+    _HIER[doc_id] = index
+
+def put_hier_loader(doc_id: str, loader: Callable[[], HierIndex]):
+    """Defer restoring doc_id's index until its first use (used by snapshot loading)."""
+    _HIER.pop(doc_id, None)
+    _PENDING[doc_id] = loader
+
+def get_hier_index(doc, vectors: bool = False) -> HierIndex:
+    """
+    Cached index for doc; restored from the snapshot or rebuilt on first use for
+    docs that skipped ingest. Offsets only, unless vectors=True asks for the
+    sentence TF-IDF.
+    """
+    hit = _HIER.get(doc.id)
+    if hit is None:
+        loader = _PENDING.pop(doc.id, None)
+        hit = _HIER[doc.id] = loader() if loader else build_hier_index(doc.text, doc.chunks, fit=False)
+    if vectors and not hit.fitted:
+        _fit_sentences(doc.text, hit)
+    return hit
+
+
+def _sentence_window(idx: HierIndex, i: int, lo_bound: int, hi_bound: int, max_chars: int) -> Tuple[int, int]:
+    """Grow outwards from sentence i, staying within [lo_bound, hi_bound] and max_chars."""
+    lo = hi = i
+    n = len(idx.sent_start)
+    while True:
+        grew = False
+        if lo - 1 >= 0 and idx.sent_start[lo - 1] >= lo_bound and idx.sent_end[hi] - idx.sent_start[lo - 1] <= max_chars:
+            lo -= 1
+            grew = True
+        if hi + 1 < n and idx.sent_end[hi + 1] <= hi_bound and idx.sent_end[hi + 1] - idx.sent_start[lo] <= max_chars:
+            hi += 1
+            grew = True
+        if not grew:
+            return int(idx.sent_start[lo]), int(idx.sent_end[hi])
+
+
+def search(doc, query: str, k: int = 3, granularity: str = "sentence") -> List[Passage]:
+    """
+    Top-k sentence hits, widened per granularity:
+      sentence - the sentence itself
+      auto     - sentence ± SENTENCE_CONTEXT neighbours, or the whole chunk if the match is weak
+      section  - the heading section around the hit (trimmed to SECTION_MAX_CHARS)
+    Hits in the same chunk are merged so each passage maps to one chunk citation.
+    Returns [] when nothing matches; callers then use chunk-level retrieve_top_k.
+    """
+    import numpy as np
+
+    idx = get_hier_index(doc, vectors=True)
+    if idx.vectorizer is None:
+        return []
+    sims = np.asarray((idx.X @ idx.vectorizer.transform([query or ""]).T).toarray()).ravel()
+    order = [int(i) for i in np.argsort(-sims)[: max(1, k)] if sims[int(i)] > 0.0]
+
+    spans: List[Tuple[int, int, int, float, int]] = []   # (chunk, start, end, score, hit sentence)
+    seen_sections = set()
+    for i in order:
+        score = float(sims[i])
+        chunk = int(idx.sent_chunk[i])
+        if granularity == "section":
+            sec = int(idx.sent_section[i])
+            if sec in seen_sections:
+                continue
+            seen_sections.add(sec)
+            s, e = _sentence_window(idx, i, int(idx.section_start[sec]), int(idx.section_end[sec]), SECTION_MAX_CHARS)
+        elif granularity == "auto" and score < AUTO_SENTENCE_MIN:
+            c = doc.chunks[chunk]
+            s, e = c.start, c.end
+        elif granularity == "auto":
+            lo = max(0, i - SENTENCE_CONTEXT)
+            hi = min(len(idx.sent_start) - 1, i + SENTENCE_CONTEXT)
+            while idx.sent_chunk[lo] != chunk:
+                lo += 1
+            while idx.sent_chunk[hi] != chunk:
+                hi -= 1
+            s, e = int(idx.sent_start[lo]), int(idx.sent_end[hi])
+        else:
+            s, e = int(idx.sent_start[i]), int(idx.sent_end[i])
+        spans.append((chunk, s, e, score, i))
+
+    # merge per chunk (in text order), keep the best score
+    by_chunk: Dict[int, List[Tuple[int, int, float, int]]] = {}
+    for chunk, s, e, score, i in spans:
+        by_chunk.setdefault(chunk, []).append((s, e, score, i))
+    passages = []
+    for chunk, items in by_chunk.items():
+        items.sort()
+        merged: List[List[int]] = []
+        for s, e, _, _ in items:
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        hits = sorted(i for _, _, _, i in items)
+        passages.append(Passage(
+            chunk_index=chunk, score=max(sc for _, _, sc, _ in items),
+            start=merged[0][0], end=merged[-1][1],
+            text=PASSAGE_JOIN.join(doc.text[s:e].strip() for s, e in merged),
+            focus=" ".join(doc.text[idx.sent_start[i]:idx.sent_end[i]].strip() for i in hits),
+        ))
+    passages.sort(key=lambda p: -p.score)
+    return passages
+
+
+def central_sentences(doc, n: int) -> List[int]:
+    """Indices (document order) of the n sentences closest to the document's TF-IDF centroid."""
+    import numpy as np
+
+    idx = get_hier_index(doc, vectors=True)
+    if idx.vectorizer is None:
+        return list(range(min(n, len(idx.sent_start))))
+    centroid = np.asarray(idx.X.mean(axis=0)).ravel()
+    scores = idx.X @ centroid
+    top = np.argsort(-np.asarray(scores).ravel())[:n]
+    return sorted(int(i) for i in top)
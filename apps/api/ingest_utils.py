@@ -1,20 +1,43 @@
+import codecs
 import hashlib
-import httpx
-import trafilatura
-from langdetect import detect, DetectorFactory
-DetectorFactory.seed = 0  # deterministic
+import os
+from typing import BinaryIO, Iterator, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+# httpx, trafilatura and langdetect are imported on first use (see warmup.py):
+# keeping them off the import path lets /health answer before they are loaded.
 
 DEFAULT_HEADERS = {
     "User-Agent": "AIScrapeBot/0.1 (+https://example.com) Python-httpx"
 }
 
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form used as a cache/dedup key: lowercase scheme and host,
+    no default port, no fragment, no trailing slash (except the root).
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((scheme, host, path, parts.query, ""))
+
 async def fetch_html(url: str, timeout_s: int = 15) -> str:
+    import httpx
     async with httpx.AsyncClient(headers=DEFAULT_HEADERS, follow_redirects=True, timeout=timeout_s) as client:
         resp = await client.get(url)
         resp.raise_for_status()
         return resp.text
 
 def extract_main(url: str, html: str):
+    import trafilatura
+    import trafilatura.metadata
     downloaded = trafilatura.extract(
         html,
         include_comments=False,
@@ -29,11 +52,75 @@ def extract_main(url: str, html: str):
     text = trafilatura.extract(html, url=url, include_comments=False, include_tables=False, with_metadata=False)
     return {"title": title, "text": text}
 
+UPLOAD_TYPES = {".pdf": "pdf", ".txt": "txt", ".md": "txt", ".docx": "docx"}
+TEXT_READ_BYTES = 64 * 1024
+
+def open_pdf(fileobj: BinaryIO):
+    """One PdfReader per upload: the xref table is parsed once, then shared by title and pages."""
+    from pypdf import PdfReader  # local import: only needed for uploads
+    return PdfReader(fileobj)
+
+def iter_pdf_pages(reader) -> Iterator[Tuple[Optional[int], str]]:
+    """Yield (page_number, text) one page at a time; pypdf only parses a page when asked."""
+    for i, page in enumerate(reader.pages, start=1):
+        try:
+            yield i, page.extract_text() or ""
+        except Exception:
+            yield i, ""  # one broken page shouldn't sink the whole file
+
+def iter_docx_paragraphs(fileobj: BinaryIO) -> Iterator[Tuple[Optional[int], str]]:
+    from docx import Document as DocxDocument  # local import: only needed for uploads
+    for para in DocxDocument(fileobj).paragraphs:
+        yield None, para.text + "\n"
+
+def iter_text_blocks(fileobj: BinaryIO, encoding: str = "utf-8-sig") -> Iterator[Tuple[Optional[int], str]]:
+    """
+    Decode a text file in fixed-size blocks instead of reading it all at once.
+    utf-8-sig drops the BOM Windows editors put at the start of .txt/.md files.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    buf = ""
+    while True:
+        block = fileobj.read(TEXT_READ_BYTES)
+        if not block:
+            break
+        buf += decoder.decode(block)
+        # hand over whole lines only, keep the tail for the next block
+        cut = buf.rfind("\n")
+        if cut != -1:
+            yield None, buf[:cut + 1]
+            buf = buf[cut + 1:]
+    buf += decoder.decode(b"", final=True)
+    if buf:
+        yield None, buf
+
+def upload_kind(filename: str | None) -> str | None:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return UPLOAD_TYPES.get(ext)
+
+def pdf_title(reader) -> str | None:
+    try:
+        meta = reader.metadata
+        title = meta.title if meta else None
+    except Exception:
+        title = None
+    return (title or "").strip() or None
+
 def content_hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
 
+_detect = None
+
+def _detector():
+    global _detect
+    if _detect is None:
+        from langdetect import detect, DetectorFactory
+        DetectorFactory.seed = 0  # deterministic
+        _detect = detect
+    return _detect
+
 def guess_lang(text: str) -> str | None:
     try:
-        return detect(text)
+        return _detector()(text)
     except Exception:
         return None
@@ -0,0 +1,129 @@
+# apps/api/jobs.py
+# Bounded background job queue: a fixed pool of asyncio workers pulls jobs
+# in priority order. When the queue is full, submit() raises QueueFull so the
+# API can push back on clients instead of piling up work.
+import asyncio
+import itertools
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+MAX_JOBS_KEPT = 1000    # finished jobs remembered for polling
+
+
+class QueueFull(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    priority: str
+    status: str = "queued"              # queued | running | done | failed
+    result: Any = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None   # HTTP-style code of the failure, if any
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    fn: Optional[Callable[[], Awaitable[Any]]] = field(default=None, repr=False)
+
+
+class JobQueue:
+    def __init__(self, workers: int, max_depth: int):
+        self.workers = max(1, workers)
+        self.max_depth = max(1, max_depth)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._seq = itertools.count()
+        self.busy = 0
+        self.submitted = self.completed = self.failed = self.rejected = 0
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue(maxsize=self.max_depth)
+        self._tasks = [t for t in self._tasks if not t.done()]
+        for _ in range(self.workers - len(self._tasks)):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def submit(self, kind: str, fn: Callable[[], Awaitable[Any]], priority: str = "normal") -> Job:
+        """Queue fn (an async callable) and return its Job right away. Raises QueueFull."""
+        self._ensure_workers()
+        job = Job(id=str(uuid4()), kind=kind, priority=priority, fn=fn)
+        try:
+            self._queue.put_nowait((PRIORITIES.get(priority, 1), next(self._seq), job))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull(f"job queue is full ({self.max_depth} waiting)")
+        self.submitted += 1
+        self._jobs[job.id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout_s: float) -> Job:
+        """Long-poll helper: return when the job finishes or timeout_s passes."""
+        if timeout_s > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=timeout_s)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            self.busy += 1
+            job.status, job.started_at = "running", datetime.utcnow()
+            try:
+                job.result = await job.fn()
+                job.status = "done"
+                self.completed += 1
+            except Exception as e:
+                # HTTPException-like errors keep their status code and detail
+                job.status = "failed"
+                job.status_code = getattr(e, "status_code", 500)
+                job.error = str(getattr(e, "detail", "") or e)
+                self.failed += 1
+            finally:
+                job.fn = None
+                job.finished_at = datetime.utcnow()
+                job.done.set()
+                self.busy -= 1
+                self._queue.task_done()
+
+    def _trim(self):
+        # drop the oldest finished jobs once we remember too many
+        extra = len(self._jobs) - MAX_JOBS_KEPT
+        if extra <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.done.is_set()][:extra]:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_max": self.max_depth,
+            "workers": self.workers,
+            "busy_workers": self.busy,
+            "utilization": round(self.busy / self.workers, 3),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+ingest_jobs = JobQueue(
+    workers=int(os.getenv("INGEST_WORKERS", "4")),
+    max_depth=int(os.getenv("INGEST_QUEUE_MAX", "100")),
+)
@@ -18,10 +18,12 @@ _SYSTEM = (
     "Do not invent citations or refer to information not in the passages."
 )
 
-def _build_messages(passages: List[str], question: str) -> list[dict]:
-    # Number the retrieved chunks 1..N for clean [#i] citations.
+def _build_messages(passages: List[str], question: str, labels: List[int] | None = None) -> list[dict]:
+    # Number the retrieved chunks 1..N for clean [#i] citations,
+    # or with the caller's labels (document chunk numbers) when given.
+    labels = labels or list(range(1, len(passages) + 1))
     ctx_lines = []
-    for i, p in enumerate(passages, start=1):
+    for i, p in zip(labels, passages):
         # Keep a little header so the model can refer to [#i]
         ctx_lines.append(f"[Chunk #{i}]\n{p.strip()}\n")
     user_prompt = (
@@ -34,19 +36,21 @@ def _build_messages(passages: List[str], question: str) -> list[dict]:
         {"role": "user", "content": "\n".join(ctx_lines) + "\n" + user_prompt},
     ]
 
-def answer_with_groq(passages: List[str], question: str, model: str, api_key: str, max_tokens: int | None) -> str:
+def answer_with_groq(passages: List[str], question: str, model: str, api_key: str, max_tokens: int | None,
+                     labels: List[int] | None = None) -> str:
     """
     passages: list of top-k chunk texts (already trimmed by caller if desired)
     question: user question string
     model: e.g., 'llama-3.1-8b-instruct'
     api_key: your GROQ_API_KEY
+    labels: chunk number to show for each passage (defaults to 1..N)
     """
     print(f"Calling Groq model={model} with {len(passages)} passages...")
     if not passages:
         return "I don’t have enough context to answer from the document."
 
     client = Groq(api_key=api_key, timeout=httpx.Timeout(10.0, read=20.0))
-    messages = _build_messages(passages, question)
+    messages = _build_messages(passages, question, labels)
 
     resp = client.chat.completions.create(
         model=model,
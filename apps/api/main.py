@@ -1,8 +1,12 @@
-from fastapi import FastAPI, HTTPException, Path
-from pydantic import BaseModel, HttpUrl
+from fastapi import FastAPI, HTTPException, Path, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, HttpUrl
 from fastapi.middleware.cors import CORSMiddleware 
-from ingest_utils import fetch_html, extract_main, content_hash, guess_lang
-from chunking import build_chunks
+from ingest_utils import fetch_html, extract_main, content_hash, guess_lang, normalize_url
+from ingest_utils import upload_kind, open_pdf, pdf_title, iter_pdf_pages, iter_docx_paragraphs, iter_text_blocks
+from chunking import build_chunks, join_pages, sentence_spans
+from hier_index import build_hier_index, put_hier_index, search as hier_search
+import extractive
 from doc_store import save_document, get_document, Document
 from typing import Literal, List, Tuple
 from summarize_utils import summarize_document
@@ -14,8 +18,28 @@ import re
 import os
 from groq_router import call_with_fallback
 from groq_router import last_status
-
-app = FastAPI(title="AI-Scrape API")
+from singleflight import SingleFlight
+import crawler
+from jobs import ingest_jobs, QueueFull
+import snapshot
+import warmup
+from contextlib import asynccontextmanager
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # warm start: pull the last snapshot into the store before taking traffic
+    if snapshot.has_snapshot(SNAPSHOT_DIR):
+        try:
+            print("Loaded snapshot:", snapshot.load_snapshot(SNAPSHOT_DIR))
+        except Exception as e:
+            print("Snapshot load failed -> starting empty:", repr(e))
+    # heavy engines load in the background while we already answer /health
+    warmup.start_background()
+    yield
+
+app = FastAPI(title="AI-Scrape API", lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -27,13 +51,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+# Concurrent duplicates of the same ingest / ask await one shared result.
+_ingest_flight = SingleFlight()
+_ask_flight = SingleFlight()
+_ask_paths: dict[str, int] = {}   # /ask responses per answer path (LLM calls saved by the gate)
+
 @app.get("/")
 def read_root():
     return {"message": "AI-Scrape API is running"}
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "coalescing": {"ingest": _ingest_flight.stats(), "ask": _ask_flight.stats()},
+        "ask_paths": dict(_ask_paths),
+        "jobs": ingest_jobs.stats(),
+        "warmup": warmup.status(),
+    }
 
 
 class SummarizeRequest(BaseModel):
@@ -45,6 +81,7 @@ class SummarizeResponse(BaseModel):
 class SummarizeByIdRequest(BaseModel):
     doc_id: str
     style: Literal["tldr", "executive", "notes"] = "tldr"
+    granularity: Literal["chunk", "section", "sentence"] = "chunk"
 
 class Bullet(BaseModel):
     text: str
@@ -60,7 +97,7 @@ def summarize_by_id(payload: SummarizeByIdRequest):
     doc = get_document(payload.doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Unknown doc_id")
-    result = summarize_document(doc, style=payload.style)
+    result = summarize_document(doc, style=payload.style, granularity=payload.granularity)
     return SummarizeByIdResponse(**result)
 
 class AskByIdRequest(BaseModel):
@@ -149,39 +186,81 @@ class AskByIdRequest(BaseModel):
     k: int = 3
     mode: Literal["extractive", "llm"] = "llm"
     tier: Literal["economy", "accuracy"] = "economy"
+    # chunk: whole chunks (default) | sentence: matching sentences only |
+    # auto: sentences, widened to the chunk when the match is weak | section: heading section
+    granularity: Literal["chunk", "sentence", "auto", "section"] = "chunk"
+    # llm mode: answer extractively (no Groq call) when confidence ≥ this;
+    # None → EXTRACTIVE_CONFIDENCE_THRESHOLD, > 1 → always call the LLM
+    min_confidence: float | None = Field(None, ge=0)
 
 class Snippet(BaseModel):
     chunk_index: int
     score: float
     text: str
+    page: int | None = None
 
 class AskByIdResponse(BaseModel):
     answer: str
     snippets: List[Snippet]
     cites: List[int]
+    # extractive: asked for / no LLM configured | extractive_confident: LLM skipped by the gate
+    # llm: Groq answered | llm_fallback: Groq failed → extractive answer
+    path: Literal["extractive", "extractive_confident", "llm", "llm_fallback"] = "extractive"
+    confidence: float = 0.0
 
 @app.post("/ask", response_model=AskByIdResponse)
-def ask_by_id(payload: AskByIdRequest):
+async def ask_by_id(payload: AskByIdRequest):
     doc = get_document(payload.doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Unknown doc_id")
 
-    # 1) retrieve
-    ranked: List[Tuple[int, float]] = retrieve_top_k(doc, payload.question, k=payload.k)
+    key = (payload.doc_id, payload.question.strip(), payload.k, payload.mode,
+           payload.granularity, payload.min_confidence)
+    # retrieval + Groq are blocking → run once in the threadpool, share the answer
+    res = await _ask_flight.do(key, lambda: run_in_threadpool(_answer, doc, payload))
+    _ask_paths[res.path] = _ask_paths.get(res.path, 0) + 1
+    return res
 
+
+def _answer(doc: Document, payload: AskByIdRequest) -> AskByIdResponse:
     snippets: list[Snippet] = []
     cites: list[int] = []
     top_chunks_texts: list[str] = []
-    for idx, score in ranked:
-        raw = doc.chunks[idx].text.strip()
-        clean = _clean_line(raw)
-        snippets.append(Snippet(chunk_index=idx + 1, score=float(score), text=clean))
-        cites.append(idx + 1)
-        top_chunks_texts.append(clean[:800])
-
-    # 2) extractive answer (baseline & fallback)
-    stitched = [_first_sentences(doc.chunks[idx].text) for idx, _ in ranked]
-    extractive_answer = "\n\n".join([s for s in stitched if s]).strip() or "No relevant content found."
+    stitched: list[str] = []
+    units: list[tuple[int, int, int]] = []    # (chunk, start, end) of what was retrieved
+
+    # 1) retrieve: sentence-level hits widened per granularity, else whole chunks
+    passages = []
+    if payload.granularity != "chunk":
+        passages = hier_search(doc, payload.question, k=payload.k, granularity=payload.granularity)
+    for p in passages:
+        clean = _clean_line(p.text)
+        snippets.append(Snippet(chunk_index=p.chunk_index + 1, score=p.score, text=clean, page=doc.chunks[p.chunk_index].page))
+        cites.append(p.chunk_index + 1)
+        top_chunks_texts.append(clean[:800])  # same per-passage prompt cap as chunk mode
+        stitched.append(_clean_line(p.focus))
+        units.append((p.chunk_index, p.start, p.end))
+
+    if not passages:
+        ranked: List[Tuple[int, float]] = retrieve_top_k(doc, payload.question, k=payload.k)
+        for idx, score in ranked:
+            raw = doc.chunks[idx].text.strip()
+            clean = _clean_line(raw)
+            snippets.append(Snippet(chunk_index=idx + 1, score=float(score), text=clean, page=doc.chunks[idx].page))
+            cites.append(idx + 1)
+            top_chunks_texts.append(clean[:800])
+            units.append((idx, doc.chunks[idx].start, doc.chunks[idx].end))
+        stitched = [_first_sentences(doc.chunks[idx].text) for idx, _ in ranked]
+
+    # 2) extractive answer (baseline & fallback): question-focused sentences,
+    #    or the lead sentences of each passage if none of them match the question
+    ex = extractive.answer(payload.question, extractive.candidates_from_spans(doc, units))
+    extractive_answer = ex.text or "\n\n".join([s for s in stitched if s]).strip() or "No relevant content found."
+    extractive_cites = ex.cites if ex.text else cites  # only the chunks the answer's sentences came from
+    threshold = extractive.CONFIDENCE_THRESHOLD if payload.min_confidence is None else payload.min_confidence
+
+    def respond(answer: str, path: str, answer_cites: list[int]) -> AskByIdResponse:
+        return AskByIdResponse(answer=answer, snippets=snippets, cites=answer_cites, path=path, confidence=ex.confidence)
 
     # 3) choose path
     provider = os.getenv("LLM_PROVIDER", "").lower()
@@ -190,20 +269,24 @@ def ask_by_id(payload: AskByIdRequest):
     # print(payload.mode, provider, "Groq key present" if groq_key else "No Groq key")
     # if user asked extractive OR Groq not available → return extractive
     if payload.mode == "extractive" or provider != "groq" or not groq_key:
-        return AskByIdResponse(answer=extractive_answer, snippets=snippets, cites=cites)
+        return respond(extractive_answer, "extractive", extractive_cites)
+
+    # confident extractive answer → no need to spend a Groq call
+    if ex.text and ex.confidence >= threshold:
+        return respond(extractive_answer, "extractive_confident", extractive_cites)
 
     # 4) try Groq; on error, fall back silently to extractive
     try:
-        llm_ans, used_model = call_with_fallback(top_chunks_texts, payload.question, groq_key)
+        llm_ans, used_model = call_with_fallback(top_chunks_texts, payload.question, groq_key, labels=cites)
         if llm_ans is None:
             # All models failed or were rate-limited → graceful degrade
             print("All Groq models failed or were rate-limited.")
-            return AskByIdResponse(answer=extractive_answer, snippets=snippets, cites=cites)
-        return AskByIdResponse(answer=llm_ans, snippets=snippets, cites=cites)
+            return respond(extractive_answer, "llm_fallback", extractive_cites)
+        return respond(llm_ans, "llm", cites)
     except Exception as e:
         # log for yourself; user still gets a good answer
         print("Groq error -> falling back:", repr(e))
-        return AskByIdResponse(answer=extractive_answer, snippets=snippets, cites=cites)
+        return respond(extractive_answer, "llm_fallback", extractive_cites)
 
 
 
@@ -236,19 +319,25 @@ class DOMIngestRequest(BaseModel):
 
 @app.post("/ingest", response_model=IngestResponse)
 async def ingest(payload: IngestRequest):
+    url = str(payload.url)
+    # a link shared widely gets fetched + extracted once, not once per caller
+    return await _ingest_flight.do(normalize_url(url), lambda: _ingest_url(url))
+
+
+async def _ingest_url(url: str) -> IngestResponse:
     try:
-        html = await fetch_html(str(payload.url))
+        html = await fetch_html(url)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Fetch failed: {e}")
 
-    extracted = extract_main(str(payload.url), html)
+    extracted = await run_in_threadpool(extract_main, url, html)
     text = (extracted.get("text") or "").strip()
-    title = extracted.get("title") or str(payload.url).split("/")[-1]
+    title = extracted.get("title") or url.split("/")[-1]
 
     if not text:
         raise HTTPException(status_code=422, detail="Could not extract main content")
 
-    return _create_doc_from_text(url=str(payload.url), title=title, text=text)
+    return await run_in_threadpool(_create_doc_from_text, url=url, title=title, text=text)
     # lang = guess_lang(text[:5000])
     # wc = len(text.split())
     # h = content_hash(text)
@@ -272,10 +361,53 @@ async def ingest(payload: IngestRequest):
     #     hash=h
     # )
 
+class IngestJobRequest(BaseModel):
+    url: HttpUrl
+    priority: Literal["high", "normal", "low"] = "normal"
+
+class JobInfo(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    priority: str
+    result: IngestResponse | None = None
+    error: str | None = None
+    status_code: int | None = None
+
+LONG_POLL_MAX_S = 30
+
+def _job_info(job) -> JobInfo:
+    return JobInfo(
+        job_id=job.id, status=job.status, priority=job.priority,
+        result=job.result, error=job.error, status_code=job.status_code,
+    )
+
+@app.post("/ingest/async", response_model=JobInfo, status_code=202)
+async def ingest_async(payload: IngestJobRequest):
+    """Queue an ingest and return a job id right away; poll GET /jobs/{job_id} for the result."""
+    url = str(payload.url)
+    try:
+        job = ingest_jobs.submit(
+            "ingest",
+            lambda: _ingest_flight.do(normalize_url(url), lambda: _ingest_url(url)),
+            priority=payload.priority,
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return _job_info(job)
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str = Path(...), wait: float = Query(0, ge=0, le=LONG_POLL_MAX_S)):
+    """wait > 0 long-polls: the call returns as soon as the job finishes or after `wait` seconds."""
+    job = ingest_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    await ingest_jobs.wait(job, wait)
+    return _job_info(job)
+
 @app.post("/ingest_dom", response_model=IngestResponse)
 async def ingest_dom(payload: DOMIngestRequest):
-    # Reuse the same extraction + doc creation path as /ingest
-    extracted = extract_main(str(payload.url), payload.html)
+    # Reuse the same extraction + doc creation path as /ingest (both CPU-bound → threadpool)
+    extracted = await run_in_threadpool(extract_main, str(payload.url), payload.html)
     text = (extracted.get("text") or "").strip()
     title = extracted.get("title") or str(payload.url).split("/")[-1]
 
@@ -283,7 +415,7 @@ async def ingest_dom(payload: DOMIngestRequest):
         raise HTTPException(status_code=422, detail="Could not extract main content from DOM")
 
     # same as /ingest
-    return _create_doc_from_text(url=str(payload.url), title=title, text=text)
+    return await run_in_threadpool(_create_doc_from_text, url=str(payload.url), title=title, text=text)
     # lang = guess_lang(text[:5000])
     # h = content_hash(text)
     # chunks = build_chunks(text, target_size=1200, overlap=200)
@@ -307,17 +439,111 @@ async def ingest_dom(payload: DOMIngestRequest):
     # )
 
 
-def _create_doc_from_text(url: str, title: str, text: str) -> IngestResponse:
+@app.post("/ingest_file", response_model=IngestResponse)
+async def ingest_file(file: UploadFile = File(...)):
+    kind = upload_kind(file.filename)
+    if not kind:
+        raise HTTPException(status_code=415, detail="Unsupported file type (expected .pdf, .txt, .md or .docx)")
+    # Starlette spools multipart uploads to a temp file once they pass 1 MB, so
+    # file.file is never the whole upload in memory. Parsing is CPU-bound → threadpool.
+    try:
+        return await run_in_threadpool(_ingest_upload, file.file, file.filename, kind)
+    finally:
+        await file.close()
+
+
+def _ingest_upload(fileobj, filename: str, kind: str) -> IngestResponse:
+    title = None
+    try:
+        if kind == "pdf":
+            reader = open_pdf(fileobj)
+            title = pdf_title(reader)
+            pages = iter_pdf_pages(reader)
+        elif kind == "docx":
+            pages = iter_docx_paragraphs(fileobj)
+        else:
+            pages = iter_text_blocks(fileobj)
+        text, page_spans = join_pages(pages)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Could not parse {kind.upper()} file: {e}")
+
+    # only trim the tail: leading whitespace would shift the page offsets
+    text = text.rstrip()
+    if not text.strip():
+        raise HTTPException(status_code=422, detail="No extractable text in file")
+
+    return _create_doc_from_text(
+        url=f"file://{filename}", title=title or filename, text=text, page_spans=page_spans
+    )
+
+
+def _create_doc_from_text(url: str, title: str, text: str, page_spans=None) -> IngestResponse:
     lang = guess_lang(text[:5000])
     h = content_hash(text)
-    chunks = build_chunks(text, target_size=1200)
+    spans = sentence_spans(text)  # shared by the chunker and the sentence/section index
+    chunks = build_chunks(text, target_size=1200, page_spans=page_spans, sent_spans=spans)
     doc_id = save_document(url=url, title=title, lang=lang, text=text, hash_=h, chunks=chunks)
+    # offsets only: the sentence TF-IDF is fitted by the first sentence/auto/section query
+    put_hier_index(doc_id, build_hier_index(text, chunks, spans, fit=False))
     return IngestResponse(
         doc_id=doc_id, title=title, lang=lang,
         word_count=len(text.split()), chunks=len(chunks), hash=h
     )
 
 
+class CrawlRequest(BaseModel):
+    url: HttpUrl
+    max_depth: int = 2          # capped at crawler.MAX_DEPTH_CAP
+    max_pages: int = 50         # capped at crawler.MAX_PAGES_CAP
+    same_domain: bool = True
+
+class CrawlStatus(BaseModel):
+    job_id: str
+    seed: str
+    status: Literal["queued", "running", "done", "cancelled", "failed"]
+    max_depth: int
+    max_pages: int
+    queued: int
+    fetched: int
+    ingested: int
+    failed: int
+    skipped_robots: int
+    doc_ids: list[str]
+    errors: list[str]
+
+def _crawl_status(job: crawler.CrawlJob) -> CrawlStatus:
+    return CrawlStatus(
+        job_id=job.id, seed=job.seed, status=job.status,
+        max_depth=job.max_depth, max_pages=job.max_pages,
+        queued=job.queued, fetched=job.fetched, ingested=job.ingested,
+        failed=job.failed, skipped_robots=job.skipped_robots,
+        doc_ids=list(job.doc_ids), errors=list(job.errors),
+    )
+
+@app.post("/crawl", response_model=CrawlStatus, status_code=202)
+async def start_crawl(payload: CrawlRequest):
+    job = crawler.start_crawl(
+        str(payload.url), _create_doc_from_text,
+        max_depth=payload.max_depth, max_pages=payload.max_pages, same_domain=payload.same_domain,
+    )
+    return _crawl_status(job)
+
+@app.get("/crawl/{job_id}", response_model=CrawlStatus)
+def crawl_status(job_id: str = Path(...)):
+    job = crawler.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    return _crawl_status(job)
+
+@app.post("/crawl/{job_id}/cancel", response_model=CrawlStatus)
+async def cancel_crawl(job_id: str = Path(...)):
+    job = crawler.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    crawler.cancel_job(job)
+    return _crawl_status(job)
+
+
 class DocInfo(BaseModel):
     doc_id: str
     url: str
@@ -343,6 +569,24 @@ def get_doc(doc_id: str = Path(...)):
         hash=doc.hash,
         preview=doc.text[:400]
     )
+def _snapshot_dir() -> str:
+    if not SNAPSHOT_DIR:
+        raise HTTPException(status_code=400, detail="Snapshots disabled (SNAPSHOT_DIR not set)")
+    return SNAPSHOT_DIR
+
+@app.post("/snapshot")
+async def export_snapshot():
+    """Write the document store + fitted indexes to SNAPSHOT_DIR."""
+    return await run_in_threadpool(snapshot.export_snapshot, _snapshot_dir())
+
+@app.post("/snapshot/load")
+async def load_snapshot():
+    """Merge the snapshot in SNAPSHOT_DIR into the running store."""
+    path = _snapshot_dir()
+    if not snapshot.has_snapshot(path):
+        raise HTTPException(status_code=404, detail="No snapshot found")
+    return await run_in_threadpool(snapshot.load_snapshot, path)
+
 @app.get("/health")
 async def health():
     return {"ok": True, "provider": os.getenv("LLM_PROVIDER"), "models": os.getenv("GROQ_MODELS")}
@@ -355,3 +599,8 @@ async def groq_health():
     """
     return last_status()
 
+@app.get("/health/jobs")
+async def jobs_health():
+    """Ingest queue depth, worker utilization and counters."""
+    return ingest_jobs.stats()
+
@@ -1,8 +1,11 @@
 # apps/api/retrieval.py
 from __future__ import annotations
-from typing import List, Tuple
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+# numpy / scikit-learn are imported inside the functions that need them:
+# sklearn alone is ~1 s of import time that /health should not wait for.
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
 def _make_vectorizer(n_docs: int) -> TfidfVectorizer:
     """
@@ -10,6 +13,7 @@ def _make_vectorizer(n_docs: int) -> TfidfVectorizer:
     For a single document, max_df must be 1.0 to avoid
     'max_df corresponds to < documents than min_df'.
     """
+    from sklearn.feature_extraction.text import TfidfVectorizer
     common = dict(
         lowercase=True,
         stop_words="english",
@@ -46,29 +50,68 @@ def build_retriever(texts: List[str]):
     X = V.fit_transform(cleaned)  # (n_docs, vocab)
     return V, X
 
+# Fitted per-document indexes: doc_id -> (vectorizer, X, idxmap).
+# Fitted on first use; snapshot loads register lazy loaders instead.
+_INDEX: Dict[str, Tuple[TfidfVectorizer, object, List[int]]] = {}
+_PENDING: Dict[str, Callable[[], Tuple[TfidfVectorizer, object, List[int]]]] = {}
+
+def _fit_index(doc) -> Optional[Tuple[TfidfVectorizer, object, List[int]]]:
+    cleaned, idxmap = _clean_inputs([c.text for c in doc.chunks])
+    if not cleaned:
+        return None
+    V = _make_vectorizer(len(cleaned))
+    try:
+        X = V.fit_transform(cleaned)  # (n_chunks, vocab)
+    except ValueError:
+        return None  # e.g. only stop words: nothing to index
+    return V, X, idxmap
+
+def get_index(doc) -> Optional[Tuple[TfidfVectorizer, object, List[int]]]:
+    """Returns the cached (vectorizer, X, idxmap) for doc, fitting it on first use."""
+    hit = _INDEX.get(doc.id)
+    if hit is not None:
+        return hit
+    loader = _PENDING.pop(doc.id, None)
+    hit = loader() if loader else _fit_index(doc)
+    if hit is not None:
+        _INDEX[doc.id] = hit
+    return hit
+
+def put_index_loader(doc_id: str, loader: Callable[[], Tuple[TfidfVectorizer, object, List[int]]]):
+    """Defer building doc_id's index until its first query (used by snapshot loading)."""
+    _INDEX.pop(doc_id, None)
+    _PENDING[doc_id] = loader
+
+def restore_vectorizer(terms: List[str], idf, n_rows: int) -> TfidfVectorizer:
+    """Rebuild a fitted vectorizer from its column-ordered vocabulary and idf weights."""
+    import numpy as np
+    V = _make_vectorizer(n_rows)
+    V.vocabulary_ = {t: i for i, t in enumerate(terms)}
+    V.idf_ = np.asarray(idf, dtype=np.float64)
+    return V
+
 def retrieve_top_k(doc, query: str, k: int = 3) -> List[Tuple[int, float]]:
     """
     Returns a list of (orig_chunk_index, score) pairs.
     """
-    # 0) gather texts and keep index mapping
-    all_texts = [c.text for c in doc.chunks]
-    cleaned, idxmap = _clean_inputs(all_texts)
-    if not cleaned:
-        return []
+    import numpy as np
 
-    # 1) fit TF-IDF on cleaned texts
-    V = _make_vectorizer(len(cleaned))
-    X = V.fit_transform(cleaned)
+    # 0) cached TF-IDF index (fitted once per document)
+    index = get_index(doc)
+    if index is None:
+        return []
+    V, X, idxmap = index
+    all_texts = [c.text for c in doc.chunks]
 
-    # 2) transform query and compute cosine sims (L2-normalized vectors)
+    # 1) transform query and compute cosine sims (L2-normalized vectors)
     q = V.transform([query or ""])
-    sims = (X @ q.T).toarray().ravel()
+    sims = np.asarray((X @ q.T).toarray()).ravel()
 
-    # 3) graceful fallback if all zeros (no overlap on headline-style pages)
+    # 2) graceful fallback if all zeros (no overlap on headline-style pages)
     if sims.size == 0 or float(np.max(sims)) == 0.0:
         order = np.argsort([-len(all_texts[i]) for i in idxmap])[: max(1, k)]
         return [(idxmap[int(i)], 0.0) for i in order]
 
-    # 4) normal top-k by similarity
+    # 3) normal top-k by similarity
     order = np.argsort(-sims)[: max(1, k)]
     return [(idxmap[int(i)], float(sims[int(i)])) for i in order]
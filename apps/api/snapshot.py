@@ -0,0 +1,288 @@
+# apps/api/snapshot.py
+# Binary snapshot of the document store + fitted TF-IDF indexes, so a fresh
+# instance can warm-start instead of beginning with an empty _DB.
+#
+# Layout (one directory, plain .npy files so they can be mmap-loaded):
+#   meta.json        version + per-document metadata (id, url, title, lang, hash, created_at,
+#                    section titles)
+#   text.npy         uint8   utf-8 of every document text, concatenated
+#   text_off.npy     int64   [n_docs+1] character offsets into the decoded text.npy
+#   chunk_off.npy    int64   [n_docs+1] chunk ranges per document
+#   chunk_span.npy   int64   [n_chunks, 4] start, end, page, page_end (-1 = no page)
+#   chunk_id.npy     S36     [n_chunks] chunk ids
+#   row_off.npy      int64   [n_docs+1] index rows per document
+#   row_chunk.npy    int32   [n_rows] chunk index of each index row (the idxmap)
+#   x_indptr.npy     int64   [n_rows+1] CSR row pointers (global)
+#   x_indices.npy    int32   CSR column indices (local to each document's vocabulary)
+#   x_data.npy       float32 CSR values
+#   term_off.npy     int64   [n_docs+1] vocabulary ranges per document
+#   term_byte_off.npy int64  [n_docs+1] byte ranges into terms.npy
+#   terms.npy        uint8   utf-8 of every vocabulary, "\n"-separated, column order
+#   idf.npy          float64 [n_terms] idf weight per term
+# Sentence/section index (version 2+):
+#   sent_off.npy     int64   [n_docs+1] sentence ranges per document
+#   sent_span.npy    int64   [n_sents, 4] start, end, chunk, section
+#   sec_off.npy      int64   [n_docs+1] section ranges per document
+#   sec_span.npy     int64   [n_sections, 2] start, end
+#   s_row_off.npy ... s_idf.npy   the sentence TF-IDF, same layout as row_off ... idf
+#                    (a document with no sentence vectors has no rows)
+from __future__ import annotations
+
+import gc
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from doc_store import Chunk, Document, all_documents, put_document
+from hier_index import HierIndex, get_hier_index, put_hier_loader, sentence_vectors
+from retrieval import get_index, put_index_loader, restore_vectorizer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SNAPSHOT_VERSION = 2
+_CSR = ("row_off", "x_indptr", "x_indices", "x_data", "term_off", "term_byte_off", "terms", "idf")
+_ARRAYS = ("text", "text_off", "chunk_off", "chunk_span", "chunk_id", "row_chunk") + _CSR
+_HIER_ARRAYS = ("sent_off", "sent_span", "sec_off", "sec_span") + tuple("s_" + n for n in _CSR)
+
+
+class _CsrPack:
+    """Concatenates per-document (vectorizer, X) pairs into the global CSR/vocabulary arrays."""
+    def __init__(self):
+        import numpy as np
+        self.row_off, self.term_off, self.term_byte_off = [0], [0], [0]
+        self.indptr: List[np.ndarray] = [np.zeros(1, dtype=np.int64)]
+        self.indices: List[np.ndarray] = []
+        self.data: List[np.ndarray] = []
+        self.term_parts: List[bytes] = []
+        self.idf: List[np.ndarray] = []
+        self.nnz = 0
+
+    def add(self, V, X):
+        import numpy as np
+        from scipy.sparse import csr_matrix
+        if V is None:
+            self.row_off.append(self.row_off[-1])
+            self.term_off.append(self.term_off[-1])
+            self.term_byte_off.append(self.term_byte_off[-1])
+            return
+        X = csr_matrix(X)
+        self.row_off.append(self.row_off[-1] + X.shape[0])
+        self.indptr.append(X.indptr[1:].astype(np.int64) + self.nnz)
+        self.indices.append(X.indices.astype(np.int32))
+        self.data.append(X.data.astype(np.float32))
+        self.nnz += X.nnz
+
+        terms = [t for t, _ in sorted(V.vocabulary_.items(), key=lambda kv: kv[1])]
+        blob = ("\n".join(terms)).encode("utf-8")
+        self.term_parts.append(blob)
+        self.term_off.append(self.term_off[-1] + len(terms))
+        self.term_byte_off.append(self.term_byte_off[-1] + len(blob))
+        self.idf.append(np.asarray(V.idf_, dtype=np.float64))
+
+    def arrays(self, prefix: str = "") -> Dict[str, np.ndarray]:
+        import numpy as np
+        return {prefix + name: arr for name, arr in {
+            "row_off": np.asarray(self.row_off, dtype=np.int64),
+            "x_indptr": np.concatenate(self.indptr),
+            "x_indices": np.concatenate(self.indices) if self.indices else np.zeros(0, dtype=np.int32),
+            "x_data": np.concatenate(self.data) if self.data else np.zeros(0, dtype=np.float32),
+            "term_off": np.asarray(self.term_off, dtype=np.int64),
+            "term_byte_off": np.asarray(self.term_byte_off, dtype=np.int64),
+            "terms": np.frombuffer(b"".join(self.term_parts), dtype=np.uint8),
+            "idf": np.concatenate(self.idf) if self.idf else np.zeros(0, dtype=np.float64),
+        }.items()}
+
+
+def export_snapshot(path: str) -> Dict[str, Any]:
+    """Write every document and its indexes to `path` (replaced atomically-ish)."""
+    import numpy as np
+    t0 = time.perf_counter()
+    docs = all_documents()
+
+    meta_docs: List[Dict[str, Any]] = []
+    text_parts: List[str] = []
+    text_off, chunk_off, sent_off, sec_off = [0], [0], [0], [0]
+    spans: List[List[int]] = []
+    chunk_ids: List[str] = []
+    row_chunk: List[int] = []
+    sent_spans: List[np.ndarray] = []
+    sec_spans: List[np.ndarray] = []
+    chunk_pack, sent_pack = _CsrPack(), _CsrPack()
+
+    for doc in docs:
+        hier = get_hier_index(doc)
+        meta_docs.append({
+            "id": doc.id, "url": doc.url, "title": doc.title, "lang": doc.lang,
+            "hash": doc.hash, "created_at": doc.created_at.isoformat(),
+            "sections": hier.section_title,
+        })
+        text_parts.append(doc.text)
+        text_off.append(text_off[-1] + len(doc.text))
+
+        for c in doc.chunks:
+            spans.append([c.start, c.end, c.page or -1, c.page_end or -1])
+            chunk_ids.append(c.id)
+        chunk_off.append(len(spans))
+
+        index = get_index(doc)
+        if index is None:
+            chunk_pack.add(None, None)
+        else:
+            V, X, idxmap = index
+            row_chunk.extend(idxmap)
+            chunk_pack.add(V, X)
+
+        sent_spans.append(np.stack([hier.sent_start, hier.sent_end, hier.sent_chunk, hier.sent_section], axis=1)
+                          .astype(np.int64))
+        sent_off.append(sent_off[-1] + len(hier.sent_start))
+        sec_spans.append(np.stack([hier.section_start, hier.section_end], axis=1).astype(np.int64))
+        sec_off.append(sec_off[-1] + len(hier.section_start))
+        # fitted here if no query needed it yet; not cached, so export doesn't pin every matrix
+        sent_pack.add(*sentence_vectors(doc.text, hier))
+
+    arrays = {
+        "text": np.frombuffer("".join(text_parts).encode("utf-8"), dtype=np.uint8),
+        "text_off": np.asarray(text_off, dtype=np.int64),
+        "chunk_off": np.asarray(chunk_off, dtype=np.int64),
+        "chunk_span": np.asarray(spans, dtype=np.int64).reshape(-1, 4),
+        "chunk_id": np.asarray(chunk_ids, dtype="S36"),
+        "row_chunk": np.asarray(row_chunk, dtype=np.int32),
+        **chunk_pack.arrays(),
+        "sent_off": np.asarray(sent_off, dtype=np.int64),
+        "sent_span": np.concatenate(sent_spans) if sent_spans else np.zeros((0, 4), dtype=np.int64),
+        "sec_off": np.asarray(sec_off, dtype=np.int64),
+        "sec_span": np.concatenate(sec_spans) if sec_spans else np.zeros((0, 2), dtype=np.int64),
+        **sent_pack.arrays("s_"),
+    }
+
+    # write next to the target, then swap, so a crash never leaves a half snapshot
+    tmp = path.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, name + ".npy"), arr)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SNAPSHOT_VERSION,
+            "created_at": datetime.utcnow().isoformat(),
+            "docs": meta_docs,
+        }, f)
+    old = path.rstrip("/") + ".old"
+    if os.path.exists(path):
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+    return {"docs": len(docs), "chunks": len(spans), "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def has_snapshot(path: str) -> bool:
+    return bool(path) and os.path.exists(os.path.join(path, "meta.json"))
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """
+    mmap the arrays and put every document back in the store. Index matrices are
+    not materialised here: each document gets lazy loaders that slice the mmapped
+    arrays on its first query. Version 1 snapshots have no sentence index; it is
+    rebuilt on first use instead.
+    """
+    import numpy as np
+    t0 = time.perf_counter()
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    version = meta.get("version")
+    if version not in (1, SNAPSHOT_VERSION):
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    names = _ARRAYS + (_HIER_ARRAYS if version >= 2 else ())
+    a = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in names}
+
+    # small per-document/per-chunk arrays → python lists once, much faster than item access
+    text_off = a["text_off"].tolist()
+    chunk_off = a["chunk_off"].tolist()
+    spans = a["chunk_span"].tolist()
+    chunk_ids = a["chunk_id"].tolist()
+    row_off = a["row_off"].tolist()
+    text = a["text"].tobytes().decode("utf-8")  # one decode, then plain str slicing
+
+    n_chunks = 0
+    # bulk-creating ~100k small objects: the cyclic GC would keep rescanning them
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i, m in enumerate(meta["docs"]):
+            doc_text = text[text_off[i]:text_off[i + 1]]
+            chunks = []
+            for j in range(chunk_off[i], chunk_off[i + 1]):
+                start, end, page, page_end = spans[j]
+                chunks.append(Chunk(
+                    id=chunk_ids[j].decode("ascii"), start=start, end=end, text=doc_text[start:end],
+                    page=page if page >= 0 else None, page_end=page_end if page_end >= 0 else None,
+                ))
+            n_chunks += len(chunks)
+            put_document(Document(
+                id=m["id"], url=m["url"], title=m["title"], lang=m["lang"], text=doc_text,
+                chunks=chunks, hash=m["hash"], created_at=datetime.fromisoformat(m["created_at"]),
+            ))
+            if row_off[i + 1] > row_off[i]:
+                put_index_loader(m["id"], _index_loader(a, i))
+            if version >= 2:
+                put_hier_loader(m["id"], _hier_loader(a, i, m["sections"]))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {"docs": len(meta["docs"]), "chunks": n_chunks, "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def _restore_csr(a: Dict[str, np.ndarray], i: int, prefix: str = ""):
+    """(vectorizer, X, (r0, r1)) for document i from one packed CSR block, or None if it has no rows."""
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    r0, r1 = int(a[prefix + "row_off"][i]), int(a[prefix + "row_off"][i + 1])
+    if r1 == r0:
+        return None
+    t0, t1 = int(a[prefix + "term_off"][i]), int(a[prefix + "term_off"][i + 1])
+    b0, b1 = int(a[prefix + "term_byte_off"][i]), int(a[prefix + "term_byte_off"][i + 1])
+    indptr = np.asarray(a[prefix + "x_indptr"][r0:r1 + 1])
+    s, e = int(indptr[0]), int(indptr[-1])
+    X = csr_matrix(
+        (np.asarray(a[prefix + "x_data"][s:e]), np.asarray(a[prefix + "x_indices"][s:e]), indptr - s),
+        shape=(r1 - r0, t1 - t0),
+    )
+    terms = a[prefix + "terms"][b0:b1].tobytes().decode("utf-8").split("\n")
+    V = restore_vectorizer(terms, a[prefix + "idf"][t0:t1], r1 - r0)
+    return V, X, (r0, r1)
+
+
+def _index_loader(a: Dict[str, np.ndarray], i: int):
+    def load():
+        V, X, (r0, r1) = _restore_csr(a, i)
+        return V, X, a["row_chunk"][r0:r1].tolist()
+    return load
+
+
+def _hier_loader(a: Dict[str, np.ndarray], i: int, section_titles: List[Optional[str]]):
+    def load() -> HierIndex:
+        import numpy as np
+        s0, s1 = int(a["sent_off"][i]), int(a["sent_off"][i + 1])
+        c0, c1 = int(a["sec_off"][i]), int(a["sec_off"][i + 1])
+        sent = np.asarray(a["sent_span"][s0:s1])
+        sec = np.asarray(a["sec_span"][c0:c1])
+
+        def vectors():
+            hit = _restore_csr(a, i, "s_")
+            return (hit[0], hit[1]) if hit else (None, None)
+
+        return HierIndex(
+            sent_start=sent[:, 0].copy(), sent_end=sent[:, 1].copy(),
+            sent_chunk=sent[:, 2].astype(np.int32), sent_section=sent[:, 3].astype(np.int32),
+            section_start=sec[:, 0].copy(), section_end=sec[:, 1].copy(),
+            section_title=list(section_titles), vectors_loader=vectors,
+        )
+    return load
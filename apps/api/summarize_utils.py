@@ -1,17 +1,17 @@
 from typing import List, Dict, Any
 from doc_store import Document, Chunk
+from hier_index import get_hier_index, central_sentences
 import re
 
+# bullets per style when summarizing at sentence granularity
+_SENTENCE_BULLETS = {"tldr": 5, "executive": 7, "notes": 12}
+
 def _sentences(text: str) -> List[str]:
     # Simple sentence split; good enough for MVP
     parts = re.split(r'(?<=[.!?])\s+(?=[A-Z0-9])', text.strip())
     return [p.strip() for p in parts if p.strip()]
 
-def summarize_document(doc: Document, style: str = "tldr") -> Dict[str, Any]:
-    """
-    style: 'tldr' | 'executive' | 'notes'
-    Returns { title, tldr, bullets: [{text, cites:[int]}] }
-    """
+def _chunk_bullets(doc: Document, style: str) -> List[Dict[str, Any]]:
     bullets: List[Dict[str, Any]] = []
 
     # take 1–2 lead sentences per chunk
@@ -27,6 +27,47 @@ def summarize_document(doc: Document, style: str = "tldr") -> Dict[str, Any]:
         else:  # tldr
             text = sents[0]
         bullets.append({"text": text, "cites": [idx]})
+    return bullets
+
+def _section_bullets(doc: Document, style: str) -> List[Dict[str, Any]]:
+    """Lead sentence(s) of each heading section, cited by the chunk they sit in."""
+    idx = get_hier_index(doc)
+    per_section = 2 if style == "notes" else 1
+    bullets: List[Dict[str, Any]] = []
+    taken: Dict[int, List[int]] = {}
+    for i, sec in enumerate(idx.sent_section.tolist()):
+        if len(taken.setdefault(sec, [])) < per_section:
+            taken[sec].append(i)
+    for sec, sent_ids in taken.items():
+        text = " ".join(doc.text[idx.sent_start[i]:idx.sent_end[i]].strip() for i in sent_ids)
+        title = idx.section_title[sec]
+        if title and text.startswith(title):
+            text = text[len(title):].strip() or text
+        cites = sorted({int(idx.sent_chunk[i]) + 1 for i in sent_ids})
+        bullets.append({"text": f"{title}: {text}" if title else text, "cites": cites})
+    return bullets
+
+def _sentence_bullets(doc: Document, style: str) -> List[Dict[str, Any]]:
+    """The document's most central sentences, in reading order, each cited by its chunk."""
+    idx = get_hier_index(doc)
+    return [
+        {"text": doc.text[idx.sent_start[i]:idx.sent_end[i]].strip(), "cites": [int(idx.sent_chunk[i]) + 1]}
+        for i in central_sentences(doc, _SENTENCE_BULLETS.get(style, 5))
+    ]
+
+def summarize_document(doc: Document, style: str = "tldr", granularity: str = "chunk") -> Dict[str, Any]:
+    """
+    style: 'tldr' | 'executive' | 'notes'
+    granularity: 'chunk' (lead sentences per chunk) | 'section' (per heading section)
+                 | 'sentence' (most central sentences)
+    Returns { title, tldr, bullets: [{text, cites:[int]}] }
+    """
+    if granularity == "section":
+        bullets = _section_bullets(doc, style)
+    elif granularity == "sentence":
+        bullets = _sentence_bullets(doc, style)
+    else:
+        bullets = _chunk_bullets(doc, style)
 
     # TL;DR: first bullet or first 25–35 words of doc
     tldr_src = bullets[0]["text"] if bullets else doc.text[:200]
@@ -0,0 +1,91 @@
+# apps/api/tests/test_crawler.py
+# Crawl a small static site served by http.server from a temp dir.
+import asyncio
+import functools
+import os
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler  # noqa: E402
+
+BODY = "<p>" + "This page has enough plain sentences for the extractor to keep. " * 20 + "</p>"
+
+SITE = {
+    "robots.txt": "User-agent: *\nDisallow: /private/\n",
+    # depth 0
+    "index.html": '<a href="/a.html">a</a> <a href="/a.html#top">a again</a> <a href="/b.html">b</a>'
+                  ' <a href="/private/p.html">private</a> <a href="http://example.org/x.html">off-site</a>'
+                  ' <a href="http://example.com:8o/bad">bad port</a>',
+    "a.html": '<a href="/c.html">c</a>',     # depth 1
+    "b.html": "",                            # depth 1
+    "private/p.html": "",                    # depth 1, disallowed
+    "c.html": '<a href="/d.html">d</a>',     # depth 2
+    "d.html": "",                            # depth 3
+}
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    for name, links in SITE.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if name.endswith(".html"):
+            links = f"<html><head><title>{name}</title></head><body><article>{BODY}{links}</article></body></html>"
+        path.write_text(links, encoding="utf-8")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(tmp_path)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _crawl(seed: str, **kwargs):
+    ingested = []
+
+    def create_doc(url, title, text):
+        ingested.append(url)
+        return SimpleNamespace(doc_id=url)
+
+    async def run():
+        # fresh pool per event loop, no politeness delay against localhost
+        crawler._POOL = crawler.FetchPool(host_delay_s=0.0)
+        crawler._ROBOTS = crawler.RobotsCache(crawler._POOL)
+        job = crawler.start_crawl(seed + "/index.html", create_doc, **kwargs)
+        await job.task
+        await crawler._POOL._get_client().aclose()
+        return job
+
+    job = asyncio.run(run())
+    return job, sorted(u[len(seed):] for u in ingested)
+
+
+def test_crawl_respects_depth_robots_domain_and_fragments(site):
+    job, pages = _crawl(site, max_depth=2, max_pages=50)
+    assert job.status == "done"
+    assert pages == ["/a.html", "/b.html", "/c.html", "/index.html"]  # d.html is depth 3
+    assert job.skipped_robots == 1          # /private/p.html
+    assert job.queued == 5                  # a.html#top deduped, off-site and bad-port links never queued
+    assert job.failed == 0
+
+
+def test_crawl_stops_at_max_pages(site):
+    job, pages = _crawl(site, max_depth=2, max_pages=2)
+    assert job.status == "done"
+    assert job.queued == 2
+    assert pages == ["/a.html", "/index.html"]
+
+
+def test_extract_links_skips_malformed_ports():
+    html = '<a href="http://example.com:8o/x">bad</a> <a href="/ok#frag">ok</a> <a href="mailto:a@b.c">mail</a>'
+    assert crawler.extract_links("http://site.test/", html) == ["http://site.test/ok"]
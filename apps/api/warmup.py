@@ -0,0 +1,64 @@
+# apps/api/warmup.py
+# Pre-load the extraction and retrieval engines (trafilatura, langdetect,
+# httpx, numpy/scikit-learn) in a background thread once the server is
+# accepting traffic, so the first real /ingest or /ask doesn't pay for them.
+import os
+import threading
+import time
+from typing import Any, Dict
+
+_SAMPLE_HTML = (
+    "<html><head><title>Warm-up</title></head><body><article>"
+    "<h1>Warm-up page</h1>"
+    "<p>This page exists only to exercise the extraction pipeline once. "
+    "It has a few sentences so the main-content heuristics have something to keep.</p>"
+    "<p>Retrieval is warmed up too, by fitting a tiny index and scoring one query.</p>"
+    "</article></body></html>"
+)
+
+_state: Dict[str, Any] = {"status": "idle", "seconds": None, "error": None}
+_lock = threading.Lock()
+
+
+def warm_up():
+    """Import and exercise the heavy engines once. Safe to call more than once."""
+    t0 = time.perf_counter()
+    _state["status"] = "running"
+    try:
+        import httpx  # noqa: F401  (fetch_html)
+        from ingest_utils import extract_main, guess_lang
+        from retrieval import _make_vectorizer
+
+        extracted = extract_main("https://warmup.local/", _SAMPLE_HTML)
+        guess_lang(extracted.get("text") or "This is an English sentence for language detection.")
+
+        texts = [
+            "Extraction turns raw HTML into clean article text.",
+            "Retrieval scores chunks against the question with TF-IDF.",
+        ]
+        V = _make_vectorizer(len(texts))
+        X = V.fit_transform(texts)
+        (X @ V.transform(["how are chunks scored"]).T).toarray()
+        _state["status"] = "done"
+    except Exception as e:
+        _state["status"] = "failed"
+        _state["error"] = repr(e)
+    finally:
+        _state["seconds"] = round(time.perf_counter() - t0, 3)
+
+
+def start_background() -> bool:
+    """Start warm_up() in a daemon thread (once). Disable with WARMUP=0."""
+    if os.getenv("WARMUP", "1") == "0":
+        _state["status"] = "disabled"
+        return False
+    with _lock:
+        if _state["status"] != "idle":
+            return False
+        _state["status"] = "scheduled"
+    threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+    return True
+
+
+def status() -> Dict[str, Any]:
+    return dict(_state)